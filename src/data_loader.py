@@ -1,11 +1,72 @@
 import os
 import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-import csv
-from datetime import datetime, time
+from sqlalchemy import func, Table
+from typing import Dict
 from database import StoreStatus, BusinessHours, Timezone
 
+# Layout of the timestamps in store_status.csv, e.g. '2023-01-22 12:09:39.388884 UTC'
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.%f %Z'
+TIME_FORMAT = '%H:%M:%S'
+
+# Layouts SQLAlchemy's SQLite DateTime and Time types store and compare values in
+SQLITE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+SQLITE_TIME_FORMAT = '%H:%M:%S.%f'
+
+def _parse_utc_timestamps(values: pd.Series) -> pd.Series:
+    """Convert a column of UTC timestamps into naive UTC datetimes
+    
+    read_csv parses the column when every row matches TIMESTAMP_FORMAT and leaves
+    it as strings otherwise (e.g. rows missing fractional seconds).
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = pd.to_datetime(values, utc=True)
+    else:
+        parsed = pd.to_datetime(values, format='mixed', utc=True, cache=True)
+    return parsed.dt.tz_convert(None)
+
+def _parse_times(values: pd.Series) -> pd.Series:
+    """Parse a column of HH:MM:SS strings into datetimes on a dummy date, NaT if invalid"""
+    return pd.to_datetime(values, format=TIME_FORMAT, errors='coerce')
+
+def _bulk_insert(db: Session, table: Table, columns: Dict[str, pd.Series]):
+    """Insert column arrays with a single executemany on the raw sqlite3 connection
+    
+    Writes to the database the session is bound to. The INSERT is compiled once from
+    the table definition and rows are bound as tuples in declared column order. This
+    bypasses the ORM and SQLAlchemy's parameter processing, so values must already be
+    in the form SQLAlchemy stores them in.
+    """
+    unknown = set(columns) - set(table.columns.keys())
+    if unknown:
+        raise ValueError(f"Unknown columns for table {table.name}: {', '.join(sorted(unknown))}")
+    
+    names = [column.name for column in table.columns if column.name in columns]
+    bind = db.get_bind()
+    sql = str(table.insert().compile(dialect=bind.dialect, column_keys=names))
+    rows = zip(*(columns[name].tolist() for name in names))
+    
+    raw = bind.raw_connection()
+    try:
+        cursor = raw.cursor()
+        try:
+            synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+            # The load can be rerun from the CSVs, so skip fsyncs while it runs
+            cursor.execute("PRAGMA synchronous=OFF")
+            try:
+                cursor.executemany(sql, rows)
+                raw.commit()
+            except Exception:
+                raw.rollback()
+                raise
+            finally:
+                # Restore durability before the connection goes back to the pool
+                cursor.execute(f"PRAGMA synchronous={synchronous}")
+        finally:
+            cursor.close()
+    finally:
+        raw.close()
+
 def load_store_status(db: Session, file_path: str):
     """Load store status data from CSV"""
     # Check if data is already loaded
@@ -15,18 +76,24 @@ def load_store_status(db: Session, file_path: str):
         return
     
     # Read CSV file
-    df = pd.read_csv(file_path)
+    df = pd.read_csv(
+        file_path,
+        dtype={'store_id': 'string', 'status': 'category'},
+        parse_dates=['timestamp_utc'],
+        date_format=TIMESTAMP_FORMAT,
+        engine='c',
+        low_memory=False
+    )
     
-    # Insert data into database
-    for _, row in df.iterrows():
-        store_status = StoreStatus(
-            store_id=str(row['store_id']),
-            timestamp_utc=pd.to_datetime(row['timestamp_utc']),
-            status=row['status']
-        )
-        db.add(store_status)
+    # Normalize timestamps to the naive UTC values stored in the database
+    timestamps = _parse_utc_timestamps(df['timestamp_utc']).dt.strftime(SQLITE_DATETIME_FORMAT)
     
-    db.commit()
+    # Insert data into database
+    _bulk_insert(db, StoreStatus.__table__, {
+        'store_id': df['store_id'],
+        'timestamp_utc': timestamps,
+        'status': df['status']
+    })
     print(f"Loaded {len(df)} store status records")
 
 def load_business_hours(db: Session, file_path: str):
@@ -38,27 +105,41 @@ def load_business_hours(db: Session, file_path: str):
         return
     
     # Read CSV file
-    df = pd.read_csv(file_path)
+    df = pd.read_csv(
+        file_path,
+        dtype={
+            'store_id': 'string',
+            'day': 'int8',
+            'start_time_local': 'string',
+            'end_time_local': 'string'
+        },
+        engine='c',
+        low_memory=False
+    )
     
-    # Insert data into database
-    for _, row in df.iterrows():
-        # Parse time strings into time objects
-        try:
-            start_time_local = datetime.strptime(row['start_time_local'], '%H:%M:%S').time()
-            end_time_local = datetime.strptime(row['end_time_local'], '%H:%M:%S').time()
-        except ValueError:
-            print(f"Invalid time format for store {row['store_id']}, day {row['day']}")
-            continue
-        
-        business_hours = BusinessHours(
-            store_id=str(row['store_id']),
-            day_of_week=int(row['day']),
-            start_time_local=start_time_local,
-            end_time_local=end_time_local
-        )
-        db.add(business_hours)
+    # Parse time strings
+    df['start_time_local'] = _parse_times(df['start_time_local'])
+    df['end_time_local'] = _parse_times(df['end_time_local'])
     
-    db.commit()
+    # Skip rows with unparseable times
+    invalid = df['start_time_local'].isna() | df['end_time_local'].isna()
+    for _, row in df[invalid].iterrows():
+        print(f"Invalid time format for store {row['store_id']}, day {row['day']}")
+    df = df[~invalid]
+    
+    # Skip rows with a day of week outside 0=Monday to 6=Sunday
+    invalid = ~df['day'].between(0, 6)
+    for _, row in df[invalid].iterrows():
+        print(f"Invalid day of week for store {row['store_id']}, day {row['day']}")
+    df = df[~invalid]
+    
+    # Insert data into database
+    _bulk_insert(db, BusinessHours.__table__, {
+        'store_id': df['store_id'],
+        'day_of_week': df['day'],
+        'start_time_local': df['start_time_local'].dt.strftime(SQLITE_TIME_FORMAT),
+        'end_time_local': df['end_time_local'].dt.strftime(SQLITE_TIME_FORMAT)
+    })
     print(f"Loaded {len(df)} business hours records")
 
 def load_timezone(db: Session, file_path: str):
@@ -70,17 +151,18 @@ def load_timezone(db: Session, file_path: str):
         return
     
     # Read CSV file
-    df = pd.read_csv(file_path)
+    df = pd.read_csv(
+        file_path,
+        dtype={'store_id': 'string', 'timezone_str': 'category'},
+        engine='c',
+        low_memory=False
+    )
     
     # Insert data into database
-    for _, row in df.iterrows():
-        timezone = Timezone(
-            store_id=str(row['store_id']),
-            timezone_str=row['timezone_str']
-        )
-        db.add(timezone)
-    
-    db.commit()
+    _bulk_insert(db, Timezone.__table__, {
+        'store_id': df['store_id'],
+        'timezone_str': df['timezone_str']
+    })
     print(f"Loaded {len(df)} timezone records")
 
 def load_all_data(db: Session, data_dir: str):
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Time
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Time, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 import os
@@ -6,7 +6,20 @@ from datetime import datetime
 
 # Create a sqlite database engine
 DATABASE_URL = "sqlite:///./store_monitoring.db"
-engine = create_engine(DATABASE_URL)
+# Background report tasks run outside the request thread that opened the connection
+engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets report scans read while data is written, and with synchronous=NORMAL
+    # commits no longer fsync; a larger page cache and mmap keep store_status pages hot
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-262144")  # 256 MiB
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    cursor.close()
 
 # Create a session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -19,18 +32,28 @@ class StoreStatus(Base):
     __tablename__ = "store_status"
     
     id = Column(Integer, primary_key=True, index=True)
-    store_id = Column(String, index=True)
+    store_id = Column(String)
     timestamp_utc = Column(DateTime)
     status = Column(String)  # 'active' or 'inactive'
+    
+    # Serves per-store time range scans already ordered by timestamp, and store_id lookups
+    __table_args__ = (
+        Index('ix_store_status_store_ts', 'store_id', 'timestamp_utc'),
+    )
 
 class BusinessHours(Base):
     __tablename__ = "business_hours"
     
     id = Column(Integer, primary_key=True, index=True)
-    store_id = Column(String, index=True)
+    store_id = Column(String)
     day_of_week = Column(Integer)  # 0=Monday, 6=Sunday
     start_time_local = Column(Time)
     end_time_local = Column(Time)
+    
+    # Also serves store_id lookups, as store_id is its leading column
+    __table_args__ = (
+        Index('ix_business_hours_store_dow', 'store_id', 'day_of_week'),
+    )
 
 class Timezone(Base):
     __tablename__ = "timezone"
@@ -48,6 +71,19 @@ class ReportStatus(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
 
+class ReportRow(Base):
+    __tablename__ = "report_row"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    report_id = Column(String, index=True)
+    store_id = Column(String)
+    uptime_last_hour = Column(Float)  # minutes
+    uptime_last_day = Column(Float)  # hours
+    uptime_last_week = Column(Float)  # hours
+    downtime_last_hour = Column(Float)  # minutes
+    downtime_last_day = Column(Float)  # hours
+    downtime_last_week = Column(Float)  # hours
+
 def init_db():
     # Create tables
     Base.metadata.create_all(bind=engine)
@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session
 from typing import Dict, Optional
 
 from database import get_db, init_db, ReportStatus, StoreStatus, BusinessHours, Timezone
-from services import trigger_report_generation, get_report_status
+from services import trigger_report_generation, get_report_status, shutdown_report_executor
 
 # Create data directory if it doesn't exist
 os.makedirs("reports", exist_ok=True)
@@ -22,6 +22,10 @@ app = FastAPI(
 @app.on_event("startup")
 async def startup_event():
     init_db()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    shutdown_report_executor()
     
 @app.get("/")
 def read_root():
@@ -43,7 +47,7 @@ async def trigger_report(background_tasks: BackgroundTasks, db: Session = Depend
     db.commit()
     
     # Trigger background report generation
-    background_tasks.add_task(trigger_report_generation, report_id, db)
+    background_tasks.add_task(trigger_report_generation, report_id)
     
     return {"report_id": report_id}
 
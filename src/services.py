@@ -1,11 +1,19 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, select, DateTime
+from sqlalchemy.engine import Connection
 import pandas as pd
 import numpy as np
 import pytz
+from numba import njit
 from datetime import datetime, timedelta, time
 import os
-from database import StoreStatus, BusinessHours, Timezone, ReportStatus
+import functools
+from collections import defaultdict
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from database import engine, SessionLocal, StoreStatus, BusinessHours, Timezone, ReportStatus, ReportRow
 import csv
 from typing import List, Dict, Tuple, Optional
 
@@ -20,120 +28,270 @@ def get_max_timestamp(db: Session) -> datetime:
         max_timestamp = datetime.utcnow()
     return max_timestamp
 
-def get_store_timezone(store_id: str, db: Session) -> str:
+DEFAULT_TIMEZONE = 'America/Chicago'
+
+# Write buffer for report CSV files
+CSV_BUFFER_SIZE = 1 << 20
+
+def load_store_timezones(conn: Connection) -> Dict[str, str]:
+    """Load the timezone of every store in a single query"""
+    tz_df = pd.read_sql_table(Timezone.__tablename__, conn)
+    return dict(zip(tz_df['store_id'], tz_df['timezone_str']))
+
+def load_business_hours_by_store(conn: Connection) -> Dict[str, List[Tuple[int, time, time]]]:
+    """Load the business hours of every store in a single query
+    
+    Returns each store's (day_of_week, start_time_local, end_time_local) rows.
+    """
+    hours_by_store = defaultdict(list)
+    for store_id, *hours in conn.execute(
+        select(
+            BusinessHours.store_id,
+            BusinessHours.day_of_week,
+            BusinessHours.start_time_local,
+            BusinessHours.end_time_local
+        )
+    ):
+        hours_by_store[store_id].append(tuple(hours))
+    return hours_by_store
+
+def load_store_ids(conn: Connection) -> List[str]:
+    """List every store with status data, ordered by store_id"""
+    return list(conn.execute(
+        select(StoreStatus.store_id).group_by(StoreStatus.store_id).order_by(StoreStatus.store_id)
+    ).scalars())
+
+def load_status_intervals(
+    conn: Connection,
+    start_time: datetime,
+    end_time: datetime
+) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Load the status intervals of every store within a time range
+    
+    Each observation's status holds until the store's next observation in the range,
+    the last one until end_time and the first one back to start_time. Returns
+    (interval_start, interval_end, is_active) arrays per store with observations in
+    the range, sorted by time, with timestamps as naive UTC datetime64[us].
+    """
+    # SQLite pairs each observation with the next one of its store and marks where
+    # each store's rows begin, so rows only carry the store_id on its first row
+    by_store = {
+        'partition_by': StoreStatus.store_id,
+        'order_by': (StoreStatus.timestamp_utc, StoreStatus.id)
+    }
+    is_first = func.row_number().over(**by_store) == 1
+    rows = conn.execute(
+        select(
+            case((is_first, StoreStatus.store_id)),
+            case((is_first, start_time), else_=StoreStatus.timestamp_utc),
+            func.lead(StoreStatus.timestamp_utc, 1, end_time, type_=DateTime).over(**by_store),
+            StoreStatus.status == 'active'
+        ).where(
+            StoreStatus.timestamp_utc >= start_time,
+            StoreStatus.timestamp_utc <= end_time
+        ).order_by(StoreStatus.store_id, StoreStatus.timestamp_utc, StoreStatus.id)
+    ).all()
+    if not rows:
+        return {}
+    
+    interval_start = np.fromiter((row[1] for row in rows), dtype='datetime64[us]', count=len(rows))
+    interval_end = np.fromiter((row[2] for row in rows), dtype='datetime64[us]', count=len(rows))
+    is_active = np.fromiter((row[3] for row in rows), dtype=bool, count=len(rows))
+    
+    starts = [i for i, row in enumerate(rows) if row[0] is not None]
+    ends = starts[1:] + [len(rows)]
+    return {
+        rows[start][0]: (interval_start[start:end], interval_end[start:end], is_active[start:end])
+        for start, end in zip(starts, ends)
+    }
+
+def get_store_timezone(store_id: str, timezones: Dict[str, str]) -> str:
     """Get the timezone for a store, default to 'America/Chicago' if not found"""
-    timezone_record = db.query(Timezone).filter(Timezone.store_id == store_id).first()
-    if timezone_record:
-        return timezone_record.timezone_str
-    return 'America/Chicago'
-
-def get_business_hours(store_id: str, db: Session) -> List[Dict]:
-    """Get business hours for a store, assume 24/7 if not found"""
-    hours = db.query(BusinessHours).filter(BusinessHours.store_id == store_id).all()
-    if hours:
-        return [
-            {
-                'day_of_week': hour.day_of_week,
-                'start_time_local': hour.start_time_local,
-                'end_time_local': hour.end_time_local
-            }
-            for hour in hours
-        ]
-    # Default to 24/7 if no business hours are found
-    return [
-        {
-            'day_of_week': day,
-            'start_time_local': time(0, 0),
-            'end_time_local': time(23, 59, 59)
-        }
-        for day in range(7)
-    ]
-
-def is_store_open(timestamp_utc: datetime, store_id: str, business_hours: List[Dict], tz_str: str) -> bool:
-    """Check if a store is open at a given UTC timestamp based on business hours"""
-    # Convert UTC timestamp to local time
-    local_tz = pytz.timezone(tz_str)
-    local_time = timestamp_utc.replace(tzinfo=pytz.utc).astimezone(local_tz)
-    
-    # Get day of week (0=Monday, 6=Sunday)
-    day_of_week = local_time.weekday()
-    
-    # Find matching business hours
-    for hours in business_hours:
-        if hours['day_of_week'] == day_of_week:
-            # Convert datetime.time to datetime.datetime for comparison
-            start_dt = datetime.combine(local_time.date(), hours['start_time_local'])
-            end_dt = datetime.combine(local_time.date(), hours['end_time_local'])
-            
-            # Check if current time is within business hours
-            if start_dt <= local_time <= end_dt:
-                return True
+    return timezones.get(store_id, DEFAULT_TIMEZONE)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# (start, end) seconds since midnight that no time of day falls within, pads days with fewer shifts
+CLOSED_HOURS = (SECONDS_PER_DAY, -1)
+
+# 24/7 business hours shared by every store without any, read-only so no caller mutates them
+_DEFAULT_START = np.zeros((7, 1), dtype=np.int32)
+_DEFAULT_END = np.full((7, 1), SECONDS_PER_DAY, dtype=np.int32)
+_DEFAULT_START.flags.writeable = False
+_DEFAULT_END.flags.writeable = False
+
+@functools.lru_cache(maxsize=1024)
+def _tz(name: str):
+    """Memoized pytz.timezone lookup"""
+    return pytz.timezone(name)
+
+def _seconds_of_day(value: time) -> int:
+    """Encode a time of day as seconds since midnight"""
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+def _end_seconds_of_day(value: time) -> int:
+    """Encode a shift's closing time as seconds since midnight, 23:59:59 meaning end of day"""
+    if value == time(23, 59, 59):
+        return SECONDS_PER_DAY
+    return _seconds_of_day(value)
+
+def get_business_hours(store_id: str, hours_by_store: Dict[str, List[Tuple[int, time, time]]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Get business hours for a store as (start_s, end_s) arrays of seconds since local
+    midnight, assume 24/7 if not found
+    
+    Both arrays have shape (7, k): one row per day of week holding each of the day's
+    k shifts as [start, end), with days that have fewer shifts padded with CLOSED_HOURS.
+    """
+    hours = hours_by_store.get(store_id)
+    if not hours:
+        # Default to 24/7 if no business hours are found
+        return _DEFAULT_START, _DEFAULT_END
+    
+    shifts_by_day = [[] for _ in range(7)]
+    for day_of_week, start_time_local, end_time_local in hours:
+        shifts_by_day[day_of_week].append(
+            (_seconds_of_day(start_time_local), _end_seconds_of_day(end_time_local))
+        )
     
-    return False
+    # Stores with business hours are closed on days they have none for
+    max_shifts = max(len(shifts) for shifts in shifts_by_day)
+    start_s = np.full((7, max_shifts), CLOSED_HOURS[0], dtype=np.int32)
+    end_s = np.full((7, max_shifts), CLOSED_HOURS[1], dtype=np.int32)
+    for day, shifts in enumerate(shifts_by_day):
+        for shift, (start, end) in enumerate(shifts):
+            start_s[day, shift] = start
+            end_s[day, shift] = end
+    return start_s, end_s
 
-def calculate_uptime_downtime(store_id: str, current_time: datetime, db: Session) -> Dict:
-    """Calculate uptime and downtime for a store"""
-    # Get store timezone
-    tz_str = get_store_timezone(store_id, db)
-    local_tz = pytz.timezone(tz_str)
+def _to_us(value: datetime) -> int:
+    """Encode a naive UTC datetime as microseconds since the epoch"""
+    return int(np.datetime64(value, 'us').astype(np.int64))
+
+def _local_to_utc_us(local: np.ndarray, local_tz) -> np.ndarray:
+    """Convert naive local datetime64 values to UTC microseconds since the epoch"""
+    # Repeated wall-clock times count as standard time, skipped ones are read with
+    # the offset in effect before the gap
+    return np.fromiter(
+        (
+            _to_us(local_tz.localize(value, is_dst=False).astimezone(pytz.utc).replace(tzinfo=None))
+            for value in local.tolist()
+        ),
+        dtype=np.int64,
+        count=len(local)
+    )
+
+def get_open_windows(
+    business_hours: Tuple[np.ndarray, np.ndarray],
+    local_tz,
+    start_time: datetime,
+    end_time: datetime
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the store's open windows between two naive UTC datetimes
     
-    # Get business hours
-    business_hours = get_business_hours(store_id, db)
+    Returns sorted, non-overlapping [start, end) windows as arrays of UTC microseconds
+    since the epoch, clipped to [start_time, end_time].
+    """
+    start_s, end_s = business_hours
+    
+    # Every local day that can overlap the range, whatever the UTC offset
+    days = np.arange(
+        np.datetime64(start_time.date(), 'D') - 1,
+        np.datetime64(end_time.date(), 'D') + 2
+    )
+    weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    midnight = days.astype('datetime64[s]')[:, np.newaxis]
+    local_start = (midnight + start_s[weekday].astype('timedelta64[s]')).ravel()
+    local_end = (midnight + end_s[weekday].astype('timedelta64[s]')).ravel()
+    is_shift = local_start < local_end
+    
+    open_start = _local_to_utc_us(local_start[is_shift], local_tz)
+    open_end = _local_to_utc_us(local_end[is_shift], local_tz)
+    
+    # Clip to the range and drop windows outside it
+    open_start = np.maximum(open_start, _to_us(start_time))
+    open_end = np.minimum(open_end, _to_us(end_time))
+    in_range = open_start < open_end
+    open_start, open_end = open_start[in_range], open_end[in_range]
+    if len(open_start) == 0:
+        return open_start, open_end
+    
+    # Merge overlapping or touching windows, e.g. overlapping shifts or 24/7 days
+    order = np.argsort(open_start, kind='stable')
+    open_start, open_end = open_start[order], np.maximum.accumulate(open_end[order])
+    is_first = np.append(True, open_start[1:] > open_end[:-1])
+    last = np.append(np.flatnonzero(is_first)[1:] - 1, len(open_start) - 1)
+    return open_start[is_first], open_end[last]
+
+@njit(cache=True)
+def _open_time_until(t: int, open_start: np.ndarray, open_end: np.ndarray, open_before: np.ndarray) -> int:
+    """Total open time from the first open window up to t"""
+    k = np.searchsorted(open_start, t, side='right') - 1
+    if k < 0:
+        return 0
+    return open_before[k] + min(t, open_end[k]) - open_start[k]
+
+@njit(cache=True)
+def integrate_status_intervals(
+    interval_start_us: np.ndarray,
+    interval_end_us: np.ndarray,
+    is_active: np.ndarray,
+    open_start_us: np.ndarray,
+    open_end_us: np.ndarray,
+    hour_ago_us: int,
+    day_ago_us: int,
+    week_ago_us: int
+) -> np.ndarray:
+    """Sum the seconds spent active and inactive during business hours in each window
+    
+    interval_start_us and interval_end_us hold the bounds of each status interval in
+    microseconds, and only the part of each interval inside the sorted, non-overlapping
+    open windows counts. Returns [uptime_hour, uptime_day, uptime_week, downtime_hour,
+    downtime_day, downtime_week].
+    """
+    # Open time before each window, so the open time within [a, b) is F(b) - F(a)
+    open_before = np.zeros(open_start_us.shape[0], dtype=np.int64)
+    for k in range(1, open_start_us.shape[0]):
+        open_before[k] = open_before[k - 1] + open_end_us[k - 1] - open_start_us[k - 1]
+    
+    window_starts = np.array([hour_ago_us, day_ago_us, week_ago_us], dtype=np.int64)
+    totals = np.zeros(6, dtype=np.int64)
+    for i in range(interval_start_us.shape[0]):
+        start = interval_start_us[i]
+        end = interval_end_us[i]
+        offset = 0 if is_active[i] else 3
+        end_open = _open_time_until(end, open_start_us, open_end_us, open_before)
+        
+        # Clip the interval to each window it overlaps
+        for w in range(3):
+            clipped_start = max(start, window_starts[w])
+            if end > clipped_start:
+                totals[offset + w] += end_open - _open_time_until(
+                    clipped_start, open_start_us, open_end_us, open_before
+                )
+    return totals / 1e6
+
+def calculate_uptime_downtime(
+    store_id: str,
+    current_time: datetime,
+    interval_start: np.ndarray,
+    interval_end: np.ndarray,
+    is_active: np.ndarray,
+    business_hours: Tuple[np.ndarray, np.ndarray],
+    tz_str: str
+) -> Dict:
+    """Calculate uptime and downtime for a store from its preloaded status intervals
+    
+    interval_start, interval_end and is_active hold the store's status intervals covering
+    the last week, as returned by load_status_intervals, and only the parts of those
+    intervals within business hours are counted.
+    """
+    local_tz = _tz(tz_str)
     
     # Define time ranges
     hour_ago = current_time - timedelta(hours=1)
     day_ago = current_time - timedelta(days=1)
     week_ago = current_time - timedelta(days=7)
     
-    # Get store status observations within the last week
-    status_records = db.query(StoreStatus).filter(
-        StoreStatus.store_id == store_id,
-        StoreStatus.timestamp_utc >= week_ago,
-        StoreStatus.timestamp_utc <= current_time
-    ).order_by(StoreStatus.timestamp_utc).all()
-    
-    if not status_records:
-        # No data for this store in the time range
-        return {
-            'store_id': store_id,
-            'uptime_last_hour': 0,
-            'uptime_last_day': 0,
-            'uptime_last_week': 0,
-            'downtime_last_hour': 0,
-            'downtime_last_day': 0,
-            'downtime_last_week': 0
-        }
-    
-    # Process observations
-    records_df = pd.DataFrame([
-        {
-            'timestamp_utc': record.timestamp_utc,
-            'status': record.status
-        }
-        for record in status_records
-    ])
-    
-    # Add a column to indicate if timestamp is within business hours
-    records_df['is_business_hours'] = records_df['timestamp_utc'].apply(
-        lambda ts: is_store_open(ts, store_id, business_hours, tz_str)
-    )
-    
-    # Filter to only include observations during business hours
-    business_hours_df = records_df[records_df['is_business_hours']]
-    
-    if business_hours_df.empty:
-        # No observations during business hours
-        return {
-            'store_id': store_id,
-            'uptime_last_hour': 0,
-            'uptime_last_day': 0,
-            'uptime_last_week': 0,
-            'downtime_last_hour': 0,
-            'downtime_last_day': 0,
-            'downtime_last_week': 0
-        }
-    
-    # Calculate uptime and downtime for each time range
     result = {
         'store_id': store_id,
         'uptime_last_hour': 0,
@@ -144,67 +302,127 @@ def calculate_uptime_downtime(store_id: str, current_time: datetime, db: Session
         'downtime_last_week': 0
     }
     
-    # For last hour
-    hour_df = business_hours_df[business_hours_df['timestamp_utc'] >= hour_ago]
-    if not hour_df.empty:
-        active_ratio = hour_df[hour_df['status'] == 'active'].shape[0] / hour_df.shape[0]
-        result['uptime_last_hour'] = active_ratio * 60  # Convert to minutes
-        result['downtime_last_hour'] = 60 - result['uptime_last_hour']
-    
-    # For last day
-    day_df = business_hours_df[business_hours_df['timestamp_utc'] >= day_ago]
-    if not day_df.empty:
-        active_ratio = day_df[day_df['status'] == 'active'].shape[0] / day_df.shape[0]
-        
-        # Calculate total business hours in the last day
-        total_business_hours = 0
-        current_local_time = current_time.replace(tzinfo=pytz.utc).astimezone(local_tz)
-        day_ago_local = day_ago.replace(tzinfo=pytz.utc).astimezone(local_tz)
-        
-        # Loop through each hour in the last day
-        for i in range(24):
-            check_time = current_local_time - timedelta(hours=i)
-            if is_store_open(check_time.astimezone(pytz.utc), store_id, business_hours, tz_str):
-                total_business_hours += 1
-        
-        result['uptime_last_day'] = active_ratio * total_business_hours
-        result['downtime_last_day'] = total_business_hours - result['uptime_last_day']
+    if len(interval_start) == 0:
+        # No data for this store in the time range
+        return result
     
-    # For last week
-    week_df = business_hours_df
-    if not week_df.empty:
-        active_ratio = week_df[week_df['status'] == 'active'].shape[0] / week_df.shape[0]
-        
-        # Calculate total business hours in the last week
-        total_business_hours = 0
-        for i in range(7*24):  # 7 days * 24 hours
-            check_time = current_time - timedelta(hours=i)
-            if is_store_open(check_time, store_id, business_hours, tz_str):
-                total_business_hours += 1
-        
-        result['uptime_last_week'] = active_ratio * total_business_hours
-        result['downtime_last_week'] = total_business_hours - result['uptime_last_week']
+    open_start_us, open_end_us = get_open_windows(business_hours, local_tz, week_ago, current_time)
+    
+    uptime_hour, uptime_day, uptime_week, downtime_hour, downtime_day, downtime_week = integrate_status_intervals(
+        interval_start.astype('datetime64[us]').view(np.int64),
+        interval_end.astype('datetime64[us]').view(np.int64),
+        is_active,
+        open_start_us,
+        open_end_us,
+        _to_us(hour_ago),
+        _to_us(day_ago),
+        _to_us(week_ago)
+    )
+    
+    # Last hour in minutes, last day and week in hours
+    result['uptime_last_hour'] = uptime_hour / 60
+    result['downtime_last_hour'] = downtime_hour / 60
+    result['uptime_last_day'] = uptime_day / 3600
+    result['downtime_last_day'] = downtime_day / 3600
+    result['uptime_last_week'] = uptime_week / 3600
+    result['downtime_last_week'] = downtime_week / 3600
     
     return result
 
-async def trigger_report_generation(report_id: str, db: Session):
-    """Generate a report in the background"""
-    try:
-        # Get current time (max timestamp in the database)
-        current_time = get_max_timestamp(db)
-        
-        # Get all unique store IDs
-        store_ids = [row[0] for row in db.query(StoreStatus.store_id).distinct().all()]
-        
-        # Calculate uptime and downtime for each store
-        results = []
-        for store_id in store_ids:
-            result = calculate_uptime_downtime(store_id, current_time, db)
-            results.append(result)
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_report_executor() -> ProcessPoolExecutor:
+    """Get the process pool shared by all report generations, starting it on first use
+    
+    Workers are spawned rather than forked, since the API server process is multithreaded.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+def discard_report_executor(executor: ProcessPoolExecutor):
+    """Drop a broken shared report pool so the next report starts a fresh one
+    
+    Does nothing if another report already replaced it.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor.shutdown()
+            _executor = None
+
+def shutdown_report_executor():
+    """Stop the shared report process pool, if it was started"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+def _calculate_uptime_downtime_task(task: Tuple) -> Dict:
+    """Unpack a per-store task for calculate_uptime_downtime in a worker process"""
+    return calculate_uptime_downtime(*task)
+
+def trigger_report_generation(report_id: str):
+    """Generate a report in the background
+    
+    Runs after the triggering request has returned, so it opens its own session
+    rather than borrowing the request's. It is a plain function so that Starlette
+    runs it in its threadpool instead of blocking the event loop.
+    """
+    with SessionLocal() as db:
+        try:
+            # Get current time (max timestamp in the database)
+            current_time = get_max_timestamp(db)
+            
+            week_ago = current_time - timedelta(days=7)
+            
+            # Load all timezones, business hours and last week's observations up front
+            with engine.connect() as conn:
+                timezones = load_store_timezones(conn)
+                hours_by_store = load_business_hours_by_store(conn)
+                store_ids = load_store_ids(conn)
+                intervals_by_store = load_status_intervals(conn, week_ago, current_time)
+            no_intervals = (
+                np.array([], dtype='datetime64[us]'),
+                np.array([], dtype='datetime64[us]'),
+                np.array([], dtype=bool)
+            )
+            
+            # Calculate uptime and downtime for each store, spread across processes
+            tasks = [
+                (
+                    store_id,
+                    current_time,
+                    *intervals_by_store.get(store_id, no_intervals),
+                    get_business_hours(store_id, hours_by_store),
+                    get_store_timezone(store_id, timezones)
+                )
+                for store_id in store_ids
+            ]
+            executor = get_report_executor()
+            try:
+                results = list(executor.map(_calculate_uptime_downtime_task, tasks, chunksize=64))
+            except BrokenProcessPool:
+                # A crashed worker (e.g. OOM) leaves the pool unusable for every later report
+                discard_report_executor(executor)
+                raise
+            
+            # Persist the results in a single executemany, committed with the report status
+            if results:
+                db.execute(
+                    ReportRow.__table__.insert(),
+                    [{'report_id': report_id, **result} for result in results]
+                )
             
-        # Create the CSV file
-        output_file = f"reports/{report_id}.csv"
-        with open(output_file, 'w', newline='') as csvfile:
+            # Create the CSV file
+            output_file = f"reports/{report_id}.csv"
             fieldnames = [
                 'store_id', 
                 'uptime_last_hour', 
@@ -214,23 +432,24 @@ async def trigger_report_generation(report_id: str, db: Session):
                 'downtime_last_day', 
                 'downtime_last_week'
             ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            result_rows = [tuple(result[field] for field in fieldnames) for result in results]
+            with open(output_file, 'w', newline='', buffering=CSV_BUFFER_SIZE) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(fieldnames)
+                writer.writerows(result_rows)
             
-            writer.writeheader()
-            for result in results:
-                writer.writerow(result)
-        
-        # Update report status
-        report = db.query(ReportStatus).filter(ReportStatus.report_id == report_id).first()
-        if report:
-            report.status = "Complete"
-            report.completed_at = datetime.utcnow()
+            # Update report status
+            report = db.query(ReportStatus).filter(ReportStatus.report_id == report_id).first()
+            if report:
+                report.status = "Complete"
+                report.completed_at = datetime.utcnow()
             db.commit()
-            
-    except Exception as e:
-        print(f"Error generating report: {str(e)}")
-        # In case of error, update report status
-        report = db.query(ReportStatus).filter(ReportStatus.report_id == report_id).first()
-        if report:
-            report.status = "Error"
-            db.commit()
\ No newline at end of file
+                
+        except Exception as e:
+            print(f"Error generating report: {str(e)}")
+            # In case of error, update report status
+            db.rollback()
+            report = db.query(ReportStatus).filter(ReportStatus.report_id == report_id).first()
+            if report:
+                report.status = "Error"
+                db.commit()
\ No newline at end of file
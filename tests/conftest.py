@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# The application modules import each other as top-level modules from src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import database
+import services
+
+
+@pytest.fixture
+def test_engine(tmp_path, monkeypatch):
+    """Point report generation at a fresh database configured like the app's"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", database._set_sqlite_pragmas)
+    database.Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(services, 'engine', engine)
+    monkeypatch.setattr(services, 'SessionLocal', sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    yield engine
+    engine.dispose()
@@ -0,0 +1,101 @@
+from datetime import datetime, time
+
+import pandas as pd
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from data_loader import _bulk_insert, load_all_data
+from database import BusinessHours, StoreStatus, Timezone
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    directory = tmp_path / 'data'
+    directory.mkdir()
+    (directory / 'store_status.csv').write_text(
+        'store_id,status,timestamp_utc\n'
+        '1,active,2023-01-18 11:59:59.999999 UTC\n'
+        '1,inactive,2023-01-18 12:00:00 UTC\n'
+        '2,active,2023-01-25 18:13:22.479220 UTC\n'
+    )
+    (directory / 'menu_hours.csv').write_text(
+        'store_id,day,start_time_local,end_time_local\n'
+        '1,0,09:00:00,17:30:00\n'
+        '1,1,bad,17:30:00\n'
+        '1,7,09:00:00,17:30:00\n'
+        '2,-1,09:00:00,17:30:00\n'
+        '2,6,00:00:00,23:59:59\n'
+    )
+    (directory / 'timezones.csv').write_text(
+        'store_id,timezone_str\n'
+        '1,America/Chicago\n'
+        '2,Asia/Kolkata\n'
+    )
+    return directory
+
+
+def test_loaded_rows_read_back_through_the_orm(test_engine, data_dir):
+    with sessionmaker(bind=test_engine)() as db:
+        load_all_data(db, str(data_dir))
+        
+        statuses = db.query(StoreStatus).order_by(StoreStatus.timestamp_utc).all()
+        assert [(s.store_id, s.timestamp_utc, s.status) for s in statuses] == [
+            ('1', datetime(2023, 1, 18, 11, 59, 59, 999999), 'active'),
+            ('1', datetime(2023, 1, 18, 12, 0, 0), 'inactive'),
+            ('2', datetime(2023, 1, 25, 18, 13, 22, 479220), 'active'),
+        ]
+        
+        # Range filters compare the stored strings with SQLAlchemy's bound values
+        week_ago = datetime(2023, 1, 18, 12, 0, 0)
+        in_range = db.execute(
+            select(StoreStatus.timestamp_utc).where(StoreStatus.timestamp_utc >= week_ago)
+        ).scalars().all()
+        assert in_range == [datetime(2023, 1, 18, 12, 0, 0), datetime(2023, 1, 25, 18, 13, 22, 479220)]
+        
+        # The rows with an invalid time or day of week are skipped
+        hours = db.query(BusinessHours).order_by(BusinessHours.store_id).all()
+        assert [(h.store_id, h.day_of_week, h.start_time_local, h.end_time_local) for h in hours] == [
+            ('1', 0, time(9, 0), time(17, 30)),
+            ('2', 6, time(0, 0), time(23, 59, 59)),
+        ]
+        
+        timezones = db.query(Timezone).order_by(Timezone.store_id).all()
+        assert [(t.store_id, t.timezone_str) for t in timezones] == [
+            ('1', 'America/Chicago'),
+            ('2', 'Asia/Kolkata'),
+        ]
+
+
+def test_failed_bulk_insert_rolls_back_and_restores_synchronous(test_engine):
+    raw = test_engine.raw_connection()
+    pooled_connection = raw.driver_connection
+    # A setting other than the connect hook's NORMAL, to check the previous value is restored
+    raw.cursor().execute("PRAGMA synchronous=FULL")
+    raw.close()
+    
+    # sqlite3 cannot bind pd.NA, so the second row fails after the first was inserted
+    with sessionmaker(bind=test_engine)() as db, pytest.raises(Exception):
+        _bulk_insert(db, Timezone.__table__, {
+            'store_id': pd.Series(['1', pd.NA], dtype='string'),
+            'timezone_str': pd.Series(['America/Chicago', 'Asia/Kolkata'])
+        })
+    
+    raw = test_engine.raw_connection()
+    try:
+        assert raw.driver_connection is pooled_connection
+        cursor = raw.cursor()
+        # 2 is FULL, 0 would be OFF
+        assert cursor.execute("PRAGMA synchronous").fetchone() == (2,)
+        assert cursor.execute("SELECT COUNT(*) FROM timezone").fetchone() == (0,)
+        cursor.close()
+    finally:
+        raw.close()
+
+
+def test_bulk_insert_rejects_unknown_columns(test_engine):
+    with sessionmaker(bind=test_engine)() as db, pytest.raises(ValueError, match='timezone'):
+        _bulk_insert(db, Timezone.__table__, {
+            'store_id': pd.Series(['1']),
+            'timezone': pd.Series(['America/Chicago'])
+        })
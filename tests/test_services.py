@@ -0,0 +1,254 @@
+import csv
+import os
+import random
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pytest
+import pytz
+from sqlalchemy.orm import sessionmaker
+
+from data_loader import load_all_data
+from database import ReportRow, ReportStatus
+from services import (
+    calculate_uptime_downtime,
+    discard_report_executor,
+    get_business_hours,
+    get_open_windows,
+    get_report_executor,
+    shutdown_report_executor,
+    trigger_report_generation
+)
+
+# 2023-01-23 is a Monday
+MONDAY = datetime(2023, 1, 23)
+
+
+def is_store_open(timestamp_utc, business_hours, tz_str):
+    """Scalar reference check of whether a store is open at a UTC timestamp"""
+    local_time = pytz.utc.localize(timestamp_utc).astimezone(pytz.timezone(tz_str))
+    start_s, end_s = business_hours
+    day_of_week = local_time.weekday()
+    secs = local_time.hour * 3600 + local_time.minute * 60 + local_time.second
+    return bool(np.any((start_s[day_of_week] <= secs) & (secs < end_s[day_of_week])))
+
+
+def split_shift_hours():
+    return get_business_hours('store', {'store': [
+        (0, time(9, 0), time(12, 0)),
+        (0, time(13, 0), time(17, 0)),
+        (1, time(9, 0), time(17, 0)),
+    ]})
+
+
+def test_default_business_hours_are_always_open():
+    business_hours = get_business_hours('store', {})
+    for hour in range(0, 24 * 7, 5):
+        ts = MONDAY + timedelta(hours=hour, minutes=59)
+        assert is_store_open(ts, business_hours, 'UTC')
+
+
+def test_business_hours_keep_every_shift_of_the_day():
+    business_hours = split_shift_hours()
+    assert is_store_open(MONDAY.replace(hour=10), business_hours, 'UTC')
+    assert not is_store_open(MONDAY.replace(hour=12, minute=30), business_hours, 'UTC')
+    assert is_store_open(MONDAY.replace(hour=14), business_hours, 'UTC')
+    # Stores with business hours are closed on days without any
+    assert not is_store_open(MONDAY.replace(day=25, hour=10), business_hours, 'UTC')
+
+
+def report(observations, business_hours, tz_str, current_time):
+    """Run calculate_uptime_downtime over (timestamp, is_active) pairs
+    
+    Each status holds until the next observation, the last one until current_time and
+    the first one back to the start of the week, as load_status_intervals returns them.
+    """
+    timestamps = [ts for ts, _ in observations]
+    return calculate_uptime_downtime(
+        'store',
+        current_time,
+        np.array([current_time - timedelta(days=7)] + timestamps[1:], dtype='datetime64[us]'),
+        np.array(timestamps[1:] + [current_time], dtype='datetime64[us]'),
+        np.array([active for _, active in observations], dtype=bool),
+        business_hours,
+        tz_str
+    )
+
+
+def nine_to_five_hours():
+    return get_business_hours('store', {'store': [
+        (day, time(9, 0), time(17, 0))
+        for day in range(7)
+    ]})
+
+
+def test_uptime_only_counts_time_within_business_hours():
+    # Polled hourly only while open and always active, report at 23:00
+    current_time = datetime(2023, 1, 29, 23, 0)
+    observations = [
+        (datetime(2023, 1, 23 + day, hour), True)
+        for day in range(7)
+        for hour in range(9, 17)
+    ]
+    result = report(observations, nine_to_five_hours(), 'UTC', current_time)
+    assert result['uptime_last_hour'] == 0
+    assert result['uptime_last_day'] == pytest.approx(8)
+    assert result['uptime_last_week'] == pytest.approx(56)
+    assert result['downtime_last_week'] == 0
+
+
+def test_uptime_with_round_the_clock_polling():
+    current_time = datetime(2023, 1, 29, 23, 0)
+    observations = [(current_time - timedelta(hours=hour), True) for hour in range(168, -1, -1)]
+    result = report(observations, nine_to_five_hours(), 'UTC', current_time)
+    assert result['uptime_last_day'] == pytest.approx(8)
+    assert result['uptime_last_week'] == pytest.approx(56)
+
+
+def test_uptime_counts_every_shift_of_a_split_shift_day():
+    current_time = MONDAY.replace(hour=23)
+    observations = [(MONDAY + timedelta(minutes=30 * step), True) for step in range(46)]
+    result = report(observations, split_shift_hours(), 'UTC', current_time)
+    assert result['uptime_last_day'] == pytest.approx(7)
+
+
+def test_open_windows_follow_daylight_saving_changes():
+    # New York moved its clocks forward on 2023-03-12, a Sunday
+    current_time = datetime(2023, 3, 13, 0, 0)
+    open_start, open_end = get_open_windows(
+        nine_to_five_hours(), pytz.timezone('America/New_York'), current_time - timedelta(days=2), current_time
+    )
+    assert open_start.astype('datetime64[us]').tolist() == [
+        datetime(2023, 3, 11, 14, 0),
+        datetime(2023, 3, 12, 13, 0),
+    ]
+    assert list(open_end - open_start) == [8 * 3600 * 10**6] * 2
+
+
+def business_minutes(business_hours, tz_str, start, end):
+    """Count the minutes in [start, end) during which the store is open"""
+    minutes = int((end - start).total_seconds() // 60)
+    return sum(
+        is_store_open(start + timedelta(minutes=minute, seconds=30), business_hours, tz_str)
+        for minute in range(minutes)
+    )
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_uptime_and_downtime_never_exceed_business_hours(seed):
+    rng = random.Random(seed)
+    tz_str = 'America/New_York'
+    current_time = datetime(2023, 1, 25, 18, 13)
+    hours = []
+    for day in range(7):
+        for _ in range(rng.randint(0, 2)):
+            start = rng.randint(0, 22 * 60)
+            end = rng.randint(start + 1, 24 * 60 - 1)
+            hours.append((day, time(start // 60, start % 60), time(end // 60, end % 60)))
+    business_hours = get_business_hours('store', {'store': hours})
+    
+    # Irregular polling with gaps, starting some time after the week began
+    observations = []
+    ts = current_time - timedelta(days=7) + timedelta(minutes=rng.randint(0, 600))
+    while ts <= current_time:
+        observations.append((ts, rng.random() < 0.8))
+        ts += timedelta(minutes=rng.choice([7, 45, 60, 61, 300]), seconds=rng.randint(0, 59))
+    
+    result = report(observations, business_hours, tz_str, current_time)
+    windows = [
+        ('hour', timedelta(hours=1), 60),
+        ('day', timedelta(days=1), 3600),
+        ('week', timedelta(days=7), 3600),
+    ]
+    for name, length, unit_s in windows:
+        total_minutes = (result[f'uptime_last_{name}'] + result[f'downtime_last_{name}']) * unit_s / 60
+        open_minutes = business_minutes(business_hours, tz_str, current_time - length, current_time)
+        assert total_minutes <= open_minutes + 1e-6
+        # The first status extends back to the start of the week, so all open time is covered
+        assert total_minutes == pytest.approx(open_minutes)
+
+
+def test_broken_report_executor_is_replaced():
+    executor = get_report_executor()
+    try:
+        with pytest.raises(BrokenProcessPool):
+            list(executor.map(os._exit, [1]))
+        discard_report_executor(executor)
+        assert list(get_report_executor().map(abs, [-1])) == [1]
+    finally:
+        shutdown_report_executor()
+
+
+def test_report_generation_end_to_end(test_engine, tmp_path, monkeypatch):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    # Reported at the latest observation, 2023-01-25 18:00 UTC, a Wednesday
+    (data_dir / 'store_status.csv').write_text(
+        'store_id,status,timestamp_utc\n'
+        'a,active,2023-01-25 16:00:00.000000 UTC\n'
+        'a,inactive,2023-01-25 17:30:00.000000 UTC\n'
+        'a,active,2023-01-25 18:00:00.000000 UTC\n'
+        'b,inactive,2023-01-24 18:00:00.000000 UTC\n'
+        'c,active,2023-01-10 12:00:00.000000 UTC\n'
+    )
+    (data_dir / 'menu_hours.csv').write_text(
+        'store_id,day,start_time_local,end_time_local\n'
+        'b,2,09:00:00,17:00:00\n'
+    )
+    # b has no timezone and falls back to America/Chicago
+    (data_dir / 'timezones.csv').write_text(
+        'store_id,timezone_str\n'
+        'a,UTC\n'
+        'c,Asia/Kolkata\n'
+    )
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'reports').mkdir()
+    
+    Session = sessionmaker(bind=test_engine)
+    with Session() as db:
+        load_all_data(db, str(data_dir))
+        db.add(ReportStatus(report_id='report', status='Running'))
+        db.commit()
+    
+    try:
+        trigger_report_generation('report')
+    finally:
+        shutdown_report_executor()
+    
+    expected = [
+        # Active all week but for 17:30-18:00 on the last day
+        ('a', 30, 23.5, 167.5, 30, 0.5, 0.5),
+        # Inactive all week, open Wednesdays 15:00-23:00 UTC
+        ('b', 0, 0, 0, 60, 3, 8),
+        # No observations within the week
+        ('c', 0, 0, 0, 0, 0, 0),
+    ]
+    with open(tmp_path / 'reports' / 'report.csv', newline='') as csvfile:
+        rows = list(csv.reader(csvfile))
+    assert rows[0] == [
+        'store_id',
+        'uptime_last_hour',
+        'uptime_last_day',
+        'uptime_last_week',
+        'downtime_last_hour',
+        'downtime_last_day',
+        'downtime_last_week'
+    ]
+    assert [row[0] for row in rows[1:]] == [store_id for store_id, *_ in expected]
+    for row, (_, *values) in zip(rows[1:], expected):
+        assert [float(value) for value in row[1:]] == pytest.approx(values)
+    
+    with Session() as db:
+        assert db.query(ReportStatus).filter(ReportStatus.report_id == 'report').one().status == 'Complete'
+        report_rows = db.query(ReportRow).filter(ReportRow.report_id == 'report').order_by(ReportRow.store_id).all()
+        assert [row.store_id for row in report_rows] == [store_id for store_id, *_ in expected]
+        for row, (_, *values) in zip(report_rows, expected):
+            assert [
+                row.uptime_last_hour,
+                row.uptime_last_day,
+                row.uptime_last_week,
+                row.downtime_last_hour,
+                row.downtime_last_day,
+                row.downtime_last_week
+            ] == pytest.approx(values)